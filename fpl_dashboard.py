@@ -8,6 +8,11 @@ A Streamlit dashboard for the FPL team selector with interactive parameter contr
 import streamlit as st
 import pandas as pd
 import json
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
 from pathlib import Path
 
 # Try to import the FPL team selector
@@ -26,17 +31,488 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Display order of positions in team tables
+POSITION_ORDER = ('GKP', 'DEF', 'MID', 'FWD')
+
+# Cell styles for the Position column
+POSITION_STYLE = {
+    'GKP': 'background-color: #ffeb3b; color: black',
+    'DEF': 'background-color: #4caf50; color: white',
+    'MID': 'background-color: #2196f3; color: white',
+    'FWD': 'background-color: #f44336; color: white'
+}
+
+def style_position(val):
+    """Background colour for a Position cell."""
+    return POSITION_STYLE.get(val, '')
+
+# Configure column types, especially the Photo column as ImageColumn
+PHOTO_COLUMN_CONFIG = {
+    "Photo": st.column_config.ImageColumn(
+        "Photo",
+        help="Player photo",
+        width="small"
+    )
+}
+
+def get_data_version(data_dir):
+    """Newest modification time of the files in the data directory."""
+    return max((p.stat().st_mtime for p in Path(data_dir).iterdir()), default=0.0)
+
+@st.cache_resource(max_entries=1)
+def get_selector(data_dir, data_version):
+    """Load FPL data once per data version and reuse the selector across reruns."""
+    return FPLTeamSelector(data_dir)
+
+# On-disk solution cache, shared across sessions, workers and server restarts
+SOLUTION_CACHE_DIR = Path(__file__).parent / ".fpl_cache"
+
+def data_version_tag(data_dir, data_version):
+    """Short tag prefixing the cache files written for one version of the data."""
+    return hashlib.sha1(f"{data_dir}:{data_version}".encode()).hexdigest()[:12]
+
+def solution_cache_key(data_dir, data_version, params):
+    """Stable hash of the solver parameters and the version of the data they were solved on."""
+    payload = dict(params, data_dir=str(data_dir), data_version=data_version)
+    return hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+def prune_solution_cache(version_tag):
+    """Remove cached solutions written for other versions of the data."""
+    for path in SOLUTION_CACHE_DIR.iterdir():
+        if not path.name.startswith(f"{version_tag}-"):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+# Number of recent solutions kept for warm-starting the solver
+MAX_SOLUTION_HINTS = 32
+
+@st.cache_resource
+def get_solution_hints():
+    """
+    Recently selected player IDs per constraint set, shared across sessions.
+    
+    Returns (lock, hints); hold the lock while reading or updating hints.
+    """
+    return threading.Lock(), {}
+
+@st.cache_data(ttl=24*60*60, show_spinner=False)
+def cached_solve(data_dir, data_version, objective, require_all_starts, max_per_team_per_position,
+                 exclude_injury_risk, fixture_weighting_tenths, last_season_weighting_tenths,
+                 bench_budget, optimize_starting_xi):
+    """
+    Solve the team selection, memoized in memory and on disk.
+    
+    Weightings are passed as integer tenths so cache keys are exact, and
+    data_version ties both caches to the data the selector actually loaded.
+    """
+    params = {
+        'objective': objective,
+        'require_all_starts': require_all_starts,
+        'max_per_team_per_position': max_per_team_per_position,
+        'exclude_injury_risk': exclude_injury_risk,
+        'fixture_weighting': fixture_weighting_tenths / 10,
+        'last_season_weighting': last_season_weighting_tenths / 10,
+        'bench_budget': bench_budget,
+        'optimize_starting_xi': optimize_starting_xi
+    }
+    version_tag = data_version_tag(data_dir, data_version)
+    cache_path = SOLUTION_CACHE_DIR / f"{version_tag}-{solution_cache_key(data_dir, data_version, params)}.pkl"
+    
+    # Reuse a solution computed by an earlier process
+    solution = None
+    try:
+        with open(cache_path, 'rb') as f:
+            solution = pickle.load(f)
+    except Exception:
+        pass
+    
+    if solution is None:
+        # Warm-start from the last squad solved under the same constraints;
+        # weighting nudges rarely change more than a couple of players
+        hints_lock, hints = get_solution_hints()
+        hint_key = (objective, require_all_starts, max_per_team_per_position,
+                    exclude_injury_risk, bench_budget, optimize_starting_xi)
+        with hints_lock:
+            hint_player_ids = hints.get(hint_key)
+        solution = get_selector(data_dir, data_version).solve_team_selection(
+            **params, hint_player_ids=hint_player_ids
+        )
+        
+        if solution:
+            with hints_lock:
+                hints.pop(hint_key, None)
+                hints[hint_key] = solution['selected_ids']
+                while len(hints) > MAX_SOLUTION_HINTS:
+                    hints.pop(next(iter(hints)))
+            
+            # Only feasible solutions are persisted. Each writer uses its own temp
+            # file and renames it into place, so concurrent workers never publish
+            # a partially written pickle. Entries for older data are dropped.
+            try:
+                SOLUTION_CACHE_DIR.mkdir(exist_ok=True)
+                prune_solution_cache(version_tag)
+                with tempfile.NamedTemporaryFile(dir=SOLUTION_CACHE_DIR, prefix=f"{version_tag}-",
+                                                 suffix=".tmp", delete=False) as f:
+                    pickle.dump(solution, f)
+                os.replace(f.name, cache_path)
+            except OSError:
+                pass
+    
+    if not solution:
+        return solution
+    
+    # Validation and derived summary tables, memoized alongside the solution
+    solution['_validation'] = FPLTeamSelector.validate_solution(solution)
+    
+    team_counts = pd.DataFrame(list(solution['by_team_counts'].items()),
+                               columns=['Team', 'Players'])
+    solution['_team_counts_df'] = team_counts.sort_values('Players', ascending=False)
+    
+    # Players sorted by position order, shared by the team table and position summary
+    selected_players_df = pd.DataFrame(solution['selected_players'])
+    selected_players_df['position'] = pd.Categorical(
+        selected_players_df['position'], categories=list(POSITION_ORDER), ordered=True
+    )
+    selected_players_df = selected_players_df.sort_values(['position', 'name'])
+    solution['_selected_players_df'] = selected_players_df
+    
+    pos_summary = selected_players_df.groupby('position', observed=False).agg({
+        'price': 'sum',
+        'proj_points': 'sum',
+        'name': 'count'
+    }).round(1)
+    pos_summary.columns = ['Total Cost (£m)', 'Total Points', 'Count']
+    solution['_pos_summary_df'] = pos_summary
+    
+    return solution
+
 @st.cache_data
-def load_player_pics(data_dir):
-    """Load player pictures from JSON file."""
+def load_player_pics(pics_path, mtime):
+    """
+    Load player pictures from JSON file (mtime is part of the cache key).
+    
+    Returns a Series of picture URLs indexed by player ID as a string, ready
+    for Series.map lookups.
+    """
     try:
-        pics_path = Path(data_dir) / "player_pics.json"
-        if pics_path.exists():
-            with open(pics_path, 'r') as f:
-                return json.load(f)
-        return {}
+        return pd.Series(json.loads(Path(pics_path).read_bytes()), dtype=object)
     except Exception:
-        return {}
+        return pd.Series(dtype=object)
+
+def player_pics_mtime(data_dir):
+    """Modification time of player_pics.json (0.0 if it is missing)."""
+    pics_path = Path(data_dir) / "player_pics.json"
+    return pics_path.stat().st_mtime if pics_path.exists() else 0.0
+
+def get_player_pics(data_dir):
+    """Player pictures, reloaded whenever player_pics.json changes on disk."""
+    return load_player_pics(str(Path(data_dir) / "player_pics.json"), player_pics_mtime(data_dir))
+
+@st.cache_data(ttl=24*60*60, max_entries=64, show_spinner=False)
+def solution_to_csv(csv_key, _df):
+    """CSV export of a team table; _df is not hashed, csv_key identifies its inputs."""
+    return _df.to_csv(index=False).encode()
+
+def render_metrics(solution):
+    """Render the headline cost, points and fixture metrics for a solution."""
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("Total Cost", f"£{solution['total_price']:.1f}m", f"£{100.0 - solution['total_price']:.1f}m remaining")
+    
+    with col2:
+        st.metric("Projected Points", f"{solution['total_proj_points']}")
+    
+    with col3:
+        st.metric("Five GameAvg Fixture Difficulty", f"{solution['avg_fixture_difficulty']:.2f}", help="Lower is easier fixtures")
+    
+    with col4:
+        if solution.get('fixture_weighting', 0) > 0:
+            st.metric("Fixture-Adjusted Points", f"{solution['total_fixture_adjusted_points']:.1f}")
+        elif solution.get('last_season_weighting', 0) > 0:
+            st.metric("History-Adjusted Points", f"{solution['total_last_season_adjusted_points']:.1f}")
+        else:
+            st.metric("Solver Status", solution['solver_status'])
+
+def render_solution(solution, player_pics, csv_key):
+    """
+    Render summary metrics, team tables, breakdowns and export for a solution.
+    
+    csv_key identifies everything the team table depends on (data version,
+    solver parameters and player pictures) and keys the memoized CSV export.
+    """
+    # Display solution summary
+    render_metrics(solution)
+    
+    # Display team table
+    st.subheader("🎯 Optimal Team")
+    
+    # Players already sorted by position order
+    selected_players_df = solution['_selected_players_df']
+    
+    # Build display columns in one pass over the frame
+    df_display = pd.DataFrame({
+        'Photo': selected_players_df['id'].astype(str).map(player_pics).fillna(""),
+        'Name': selected_players_df['name'],
+        'Position': selected_players_df['position'],
+        'Team': selected_players_df['team_name'],
+        'Price': selected_players_df['price'].map('£{:.1f}m'.format),
+        'Points': selected_players_df['proj_points'].map('{:.0f}'.format),
+        'Fixture Difficulty': selected_players_df['avg_fixture_difficulty_5'].map('{:.1f}'.format)
+    })
+    
+    # Add conditional columns based on weightings
+    if solution.get('last_season_weighting', 0) > 0:
+        df_display = df_display.assign(**{
+            'Current PPG': selected_players_df['current_points_per_gw'].map('{:.1f}'.format),
+            'Last Season PPG': selected_players_df['last_season_points_per_gw'].map('{:.1f}'.format)
+        })
+    
+    # Add fixtures as the last column
+    df_display['Next 5 Fixtures'] = selected_players_df['next_5_fixtures']
+    
+    # Arrow-backed strings let Streamlit serialize the table without inferring a schema
+    df_display = df_display.astype({col: 'string[pyarrow]' for col in df_display.columns})
+    
+    # Display dataframes
+    if solution.get('starting_xi_players'):
+        # Split into Starting XI and Bench tables
+        starting_xi_ids = {p['id'] for p in solution['starting_xi_players']}
+        is_starter = selected_players_df['id'].isin(starting_xi_ids).to_numpy()
+        df_starting_xi = df_display[is_starter]
+        df_bench = df_display[~is_starter]
+        
+        # Display Starting XI table
+        st.subheader("🟢 Starting XI")
+        if len(df_starting_xi) > 0:
+            styled_starting_xi = df_starting_xi.style.map(style_position, subset=['Position'])
+            st.dataframe(
+                styled_starting_xi,
+                use_container_width=True,
+                hide_index=True,
+                column_config=PHOTO_COLUMN_CONFIG,
+                height=len(df_starting_xi) * 35 + 40
+            )
+        
+        # Display Bench table
+        st.subheader("🟠 Bench")
+        if len(df_bench) > 0:
+            styled_bench = df_bench.style.map(style_position, subset=['Position'])
+            st.dataframe(
+                styled_bench,
+                use_container_width=True,
+                hide_index=True,
+                column_config=PHOTO_COLUMN_CONFIG,
+                height=len(df_bench) * 35 + 40
+            )
+    else:
+        # Single table display (legacy behavior)
+        styled_df = df_display.style.map(style_position, subset=['Position'])
+        st.dataframe(
+            styled_df,
+            use_container_width=True, 
+            hide_index=True,
+            column_config=PHOTO_COLUMN_CONFIG,
+            height=len(df_display) * 35 + 40
+        )
+    
+    # Team composition tables
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        # Team distribution as table
+        st.subheader("Team Distribution")
+        st.dataframe(solution['_team_counts_df'], use_container_width=True, hide_index=True)
+    
+    with col2:
+        # Position breakdown
+        st.subheader("Position Summary")
+        st.dataframe(solution['_pos_summary_df'], use_container_width=True)
+    
+    # Show starting XI and bench breakdown if applicable
+    if solution.get('starting_xi_stats'):
+        st.subheader("🏃 Starting XI vs Bench Breakdown")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.info(f"**Starting XI ({solution['starting_xi_stats']['formation']})**")
+            st.metric("Starting XI Cost", f"£{solution['starting_xi_stats']['total_price']:.1f}m")
+            st.metric("Starting XI Points", f"{solution['starting_xi_stats']['total_proj_points']}")
+        
+        with col2:
+            st.info(f"**Bench ({solution['bench_stats']['count']} players)**")
+            bench_cost = solution['bench_stats']['total_price']
+            bench_budget_limit = solution.get('bench_budget')
+            if bench_budget_limit:
+                st.metric("Bench Cost", f"£{bench_cost:.1f}m", f"£{bench_budget_limit - bench_cost:.1f}m under budget")
+            else:
+                st.metric("Bench Cost", f"£{bench_cost:.1f}m")
+            st.metric("Bench Points", f"{solution['bench_stats']['total_proj_points']}")
+    
+    # Validation results
+    validation = solution['_validation']
+    st.subheader("✅ Validation")
+    val_col1, val_col2, val_col3, val_col4, val_col5 = st.columns(5)
+    
+    with val_col1:
+        status = "✅" if validation['valid'] else "❌"
+        st.metric("Overall Valid", status)
+    
+    with val_col2:
+        status = "✅" if validation['squad_size'] else "❌"
+        st.metric("Squad Size (15)", status)
+    
+    with val_col3:
+        status = "✅" if validation['budget'] else "❌"
+        st.metric("Budget (≤£100m)", status)
+    
+    with val_col4:
+        status = "✅" if validation['positions'] else "❌"
+        st.metric("Positions (2-5-5-3)", status)
+    
+    with val_col5:
+        status = "✅" if validation['club_limits'] else "❌"
+        st.metric("Club Limits (≤3)", status)
+    
+    # Additional validations if applicable
+    if solution.get('starting_xi_stats') or solution.get('bench_budget') is not None:
+        val_col6, val_col7 = st.columns([1, 1])
+        
+        if solution.get('starting_xi_stats'):
+            with val_col6:
+                status = "✅" if validation.get('starting_xi_valid', True) else "❌"
+                formation = solution.get('starting_xi_stats', {}).get('formation', 'N/A')
+                st.metric(f"Starting XI ({formation})", status)
+        
+        if solution.get('bench_budget') is not None:
+            with val_col7:
+                status = "✅" if validation.get('bench_budget_valid', True) else "❌"
+                st.metric("Bench Budget", status)
+    
+    # Export functionality
+    st.subheader("📋 Export")
+    
+    # Player IDs for FPL import
+    player_ids = solution['selected_ids']
+    id_string = ",".join(map(str, player_ids))
+    
+    st.text_area(
+        "Player IDs (for FPL import tools):",
+        value=id_string,
+        height=100,
+        help="Copy these player IDs to import into FPL tools"
+    )
+    
+    # Download CSV (serialized once per distinct set of table inputs)
+    st.download_button(
+        label="📄 Download as CSV",
+        data=solution_to_csv(csv_key, df_display),
+        file_name="fpl_optimal_team.csv",
+        mime="text/csv"
+    )
+
+@st.fragment
+def results_panel(data_dir, solve_params):
+    """
+    Solve and render the optimal team.
+    
+    Runs as a fragment, so widgets inside the results (e.g. the CSV download)
+    rerun only this panel rather than the whole script.
+    """
+    solution = None
+
+    try:
+        # Data version is read once so the solve and cache keys agree
+        data_version = get_data_version(data_dir)
+        
+        with st.spinner("Loading FPL data and optimizing team..."):
+            # Run optimization (memoized, so unchanged parameters skip the solver)
+            solution = cached_solve(data_dir, data_version, **solve_params)
+        
+        # Rendering stays under the same handler, so e.g. a stale cached solution
+        # shows the friendly error rather than a traceback
+        if solution:
+            csv_key = (data_version, tuple(sorted(solve_params.items())), player_pics_mtime(data_dir))
+            render_solution(solution, get_player_pics(data_dir), csv_key)
+        else:
+            st.error("❌ No feasible solution found! Try relaxing some constraints.")
+        
+    except Exception as e:
+        st.error(f"❌ Error: {str(e)}")
+        st.info("Make sure you have run the data processing script and have valid FPL data files.")
+
+    if not solution:
+        # No solution - show instructions
+        st.markdown("""
+        ## 🚀 Getting Started
+    
+        1. **Adjust parameters** in the sidebar:
+           - Choose optimization objective (maximize points vs maximize spend)
+           - Set fixture difficulty weighting (0.0 = ignore, 1.0 = heavy influence)
+           - Set last season weighting (0.0 = ignore history, 1.0 = heavy historical influence)
+           - Configure player selection constraints
+    
+        2. **The team re-optimizes automatically** whenever a parameter changes
+    
+        3. **Review results** including:
+           - Optimal 15-player squad
+           - Cost breakdown and points projection
+           - Team and position distributions
+           - Validation against FPL rules
+    
+        ## 📊 Features
+    
+        - **Integer Linear Programming**: Uses OR-Tools for mathematically optimal solutions
+        - **Multi-objective**: Balance current form, fixtures, and historical performance
+        - **FPL Constraints**: Respects budget, positions, and club limits
+        - **Flexible Filtering**: Include/exclude rotation players, injury risks
+        - **Export Ready**: Get player IDs and CSV downloads
+    
+        ## 🔧 Requirements
+    
+        Make sure you have:
+        - FPL data files in `fpl_data/` directory
+        - Run `process_fpl_data.py` to get latest data
+        - OR-Tools installed: `uv add ortools`
+        - Streamlit installed: `uv add streamlit`
+        """)
+    
+        # Show example parameters
+        with st.expander("💡 Example Parameter Combinations"):
+            st.markdown("""
+            **Conservative (Current Form Focus):**
+            - Fixture Weighting: 0.0
+            - Last Season Weighting: 0.0
+            - All constraints enabled
+            - Optimize Starting XI: ON
+        
+            **Balanced Approach:**
+            - Fixture Weighting: 0.3
+            - Last Season Weighting: 0.4
+            - Regular starters only
+            - Optimize Starting XI: ON
+        
+            **Historical Focus:**
+            - Fixture Weighting: 0.1
+            - Last Season Weighting: 0.7
+            - Allow rotation players
+            - Optimize Starting XI: ON
+        
+            **Fixture-Heavy:**
+            - Fixture Weighting: 0.8
+            - Last Season Weighting: 0.2
+            - Exclude injury risks
+            - Optimize Starting XI: ON
+        
+            **Budget-Conscious (Cheap Bench):**
+            - Fixture Weighting: 0.2
+            - Last Season Weighting: 0.3
+            - Optimize Starting XI: ON
+            - Bench Budget: £18.0m
+            """)
 
 st.title("⚽ FPL Team Selector Dashboard")
 st.markdown("Optimize your Fantasy Premier League team using Integer Linear Programming. ")
@@ -55,24 +531,24 @@ objective = st.sidebar.selectbox(
     help="max_points: Maximize projected points | max_spend: Maximize budget usage"
 )
 
-# Weighting sliders
-fixture_weighting = st.sidebar.slider(
+# Weighting sliders (quantized to tenths to keep cache keys stable)
+fixture_weighting = round(st.sidebar.slider(
     "Fixture Difficulty Weighting",
     min_value=0.0,
     max_value=1.0,
     value=0.0,
     step=0.1,
     help="Higher weight = more influence from fixture difficulty (0.0 = ignore fixtures)"
-)
+) * 10) / 10
 
-last_season_weighting = st.sidebar.slider(
+last_season_weighting = round(st.sidebar.slider(
     "Last Season Performance Weighting",
     min_value=0.0,
     max_value=1.0,
     value=0.0,
     step=0.1,
     help="Higher weight = more influence from 2023/24 season data (0.0 = ignore history)"
-)
+) * 10) / 10
 
 # Boolean constraints
 st.sidebar.subheader("Player Selection Constraints")
@@ -124,519 +600,25 @@ if bench_budget_enabled:
 # Data directory (hardcoded)
 data_dir = "fpl_data"
 
-# Auto-refresh (hardcoded to True)
-auto_refresh = True
-
-# Manual optimization button (only show when auto-refresh is off)
-if not auto_refresh:
-    run_optimization = st.sidebar.button(
-        "🚀 Optimize Team",
-        type="primary",
-        help="Run the optimization with current parameters",
-        disabled=not SELECTOR_AVAILABLE
-    )
-else:
-    run_optimization = True  # Always run when auto-refresh is enabled
-
 # Main content area
 if not SELECTOR_AVAILABLE:
     st.error(f"❌ Cannot load FPL Team Selector: {IMPORT_ERROR}")
     st.info("Make sure to install required dependencies: `uv add ortools`")
     st.stop()
 
-# Create a key from current parameters to detect changes
-current_params = (
-    objective, fixture_weighting, last_season_weighting,
-    require_all_starts, max_per_team_per_position, exclude_injury_risk, data_dir,
-    optimize_starting_xi, bench_budget
-)
-
-# Initialize session state for parameters
-if 'last_params' not in st.session_state:
-    st.session_state.last_params = None
-    st.session_state.solution = None
-
-# Check if parameters changed
-params_changed = st.session_state.last_params != current_params
-
-# Run optimization if button clicked or auto-refresh enabled and params changed
-should_optimize = run_optimization and (not auto_refresh or params_changed or st.session_state.solution is None)
-
-if should_optimize:
-    try:
-        with st.spinner("Loading FPL data and optimizing team..."):
-            # Initialize selector
-            selector = FPLTeamSelector(data_dir)
-            
-            # Run optimization
-            solution = selector.solve_team_selection(
-                objective=objective,
-                require_all_starts=require_all_starts,
-                max_per_team_per_position=max_per_team_per_position,
-                exclude_injury_risk=exclude_injury_risk,
-                fixture_weighting=fixture_weighting,
-                last_season_weighting=last_season_weighting,
-                bench_budget=bench_budget,
-                optimize_starting_xi=optimize_starting_xi
-            )
-        
-        if solution:
-            # Store solution in session state
-            st.session_state.solution = solution
-            st.session_state.last_params = current_params
-            
-            # Display solution summary
-            col1, col2, col3, col4 = st.columns(4)
-            
-            with col1:
-                st.metric("Total Cost", f"£{solution['total_price']:.1f}m", f"£{100.0 - solution['total_price']:.1f}m remaining")
-            
-            with col2:
-                st.metric("Projected Points", f"{solution['total_proj_points']}")
-            
-            with col3:
-                st.metric("Five GameAvg Fixture Difficulty", f"{solution['avg_fixture_difficulty']:.2f}", help="Lower is easier fixtures")
-            
-            with col4:
-                if solution.get('fixture_weighting', 0) > 0:
-                    st.metric("Fixture-Adjusted Points", f"{solution['total_fixture_adjusted_points']:.1f}")
-                elif solution.get('last_season_weighting', 0) > 0:
-                    st.metric("History-Adjusted Points", f"{solution['total_last_season_adjusted_points']:.1f}")
-                else:
-                    st.metric("Solver Status", solution['solver_status'])
-            
-            # Display team table
-            st.subheader("🎯 Optimal Team")
-            
-            # Load player pictures
-            player_pics = load_player_pics(data_dir)
-            
-            # Prepare display data ordered by position
-            position_order = ['GKP', 'DEF', 'MID', 'FWD']
-            
-            # Check if we should display separate tables for Starting XI and Bench
-            if solution.get('starting_xi_players'):
-                # Create separate datasets for Starting XI and Bench
-                starting_xi_ids = [p['id'] for p in solution['starting_xi_players']]
-                
-                # Starting XI players
-                starting_xi_data = []
-                bench_data = []
-                
-                # Sort players by position order first
-                selected_players_df = pd.DataFrame(solution['selected_players'])
-                selected_players_df['position_order'] = selected_players_df['position'].map({pos: i for i, pos in enumerate(position_order)})
-                selected_players_df = selected_players_df.sort_values(['position_order', 'name'])
-                
-                for _, player in selected_players_df.iterrows():
-                    # Get player picture URL
-                    pic_url = player_pics.get(str(player['id']), "")
-                    
-                    row = {
-                        'Photo': pic_url,
-                        'Name': player['name'],
-                        'Position': player['position'],
-                        'Team': player['team_name'],
-                        'Price': f"£{player['price']:.1f}m",
-                        'Points': f"{player['proj_points']:.0f}",
-                        'Fixture Difficulty': f"{player['avg_fixture_difficulty_5']:.1f}"
-                    }
-                    
-                    # Add conditional columns based on weightings
-                    if solution.get('last_season_weighting', 0) > 0:
-                        row['Current PPG'] = f"{player['current_points_per_gw']:.1f}"
-                        row['Last Season PPG'] = f"{player['last_season_points_per_gw']:.1f}"
-                    
-                    # Add fixtures as the last column
-                    row['Next 5 Fixtures'] = player['next_5_fixtures']
-                    
-                    # Separate into Starting XI vs Bench
-                    if player['id'] in starting_xi_ids:
-                        starting_xi_data.append(row)
-                    else:
-                        bench_data.append(row)
-                
-                df_starting_xi = pd.DataFrame(starting_xi_data)
-                df_bench = pd.DataFrame(bench_data)
-                
-            else:
-                # Single table for all players (legacy behavior)
-                display_data = []
-                selected_players_df = pd.DataFrame(solution['selected_players'])
-                selected_players_df['position_order'] = selected_players_df['position'].map({pos: i for i, pos in enumerate(position_order)})
-                selected_players_df = selected_players_df.sort_values(['position_order', 'name'])
-                
-                for _, player in selected_players_df.iterrows():
-                    pic_url = player_pics.get(str(player['id']), "")
-                    
-                    row = {
-                        'Photo': pic_url,
-                        'Name': player['name'],
-                        'Position': player['position'],
-                        'Team': player['team_name'],
-                        'Price': f"£{player['price']:.1f}m",
-                        'Points': f"{player['proj_points']:.0f}",
-                        'Fixture Difficulty': f"{player['avg_fixture_difficulty_5']:.1f}"
-                    }
-                    
-                    if solution.get('last_season_weighting', 0) > 0:
-                        row['Current PPG'] = f"{player['current_points_per_gw']:.1f}"
-                        row['Last Season PPG'] = f"{player['last_season_points_per_gw']:.1f}"
-                    
-                    row['Next 5 Fixtures'] = player['next_5_fixtures']
-                    display_data.append(row)
-                
-                df_display = pd.DataFrame(display_data)
-            
-            # Style the dataframe
-            def style_position(val):
-                color_map = {
-                    'GKP': 'background-color: #ffeb3b; color: black',
-                    'DEF': 'background-color: #4caf50; color: white',
-                    'MID': 'background-color: #2196f3; color: white',
-                    'FWD': 'background-color: #f44336; color: white'
-                }
-                return color_map.get(val, '')
-            
-            def style_role(val):
-                role_map = {
-                    'Starting XI': 'background-color: #4caf50; color: white; font-weight: bold',
-                    'Bench': 'background-color: #ff9800; color: white; font-weight: bold'
-                }
-                return role_map.get(val, '')
-            
-            # Configure column types, especially the Photo column as ImageColumn
-            column_config = {
-                "Photo": st.column_config.ImageColumn(
-                    "Photo",
-                    help="Player photo",
-                    width="small"
-                )
-            }
-            
-            # Display dataframes
-            if solution.get('starting_xi_players'):
-                # Display Starting XI table
-                st.subheader("🟢 Starting XI")
-                if len(df_starting_xi) > 0:
-                    styled_starting_xi = df_starting_xi.style.applymap(style_position, subset=['Position'])
-                    st.dataframe(
-                        df_starting_xi,
-                        use_container_width=True,
-                        hide_index=True,
-                        column_config=column_config,
-                        height=len(df_starting_xi) * 35 + 40
-                    )
-                
-                # Display Bench table
-                st.subheader("🟠 Bench")
-                if len(df_bench) > 0:
-                    styled_bench = df_bench.style.applymap(style_position, subset=['Position'])
-                    st.dataframe(
-                        df_bench,
-                        use_container_width=True,
-                        hide_index=True,
-                        column_config=column_config,
-                        height=len(df_bench) * 35 + 40
-                    )
-            else:
-                # Single table display (legacy behavior)
-                styled_df = df_display.style.applymap(style_position, subset=['Position'])
-                st.dataframe(
-                    df_display, 
-                    use_container_width=True, 
-                    hide_index=True,
-                    column_config=column_config,
-                    height=len(df_display) * 35 + 40
-                )
-            
-            # Team composition tables
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                # Team distribution as table
-                st.subheader("Team Distribution")
-                team_counts = pd.DataFrame(list(solution['by_team_counts'].items()), 
-                                         columns=['Team', 'Players'])
-                team_counts = team_counts.sort_values('Players', ascending=False)
-                st.dataframe(team_counts, use_container_width=True, hide_index=True)
-            
-            with col2:
-                # Position breakdown
-                positions_df = pd.DataFrame(solution['selected_players'])
-                pos_summary = positions_df.groupby('position').agg({
-                    'price': 'sum',
-                    'proj_points': 'sum',
-                    'name': 'count'
-                }).round(1)
-                pos_summary.columns = ['Total Cost (£m)', 'Total Points', 'Count']
-                pos_summary = pos_summary.reindex(['GKP', 'DEF', 'MID', 'FWD'])
-                
-                st.subheader("Position Summary")
-                st.dataframe(pos_summary, use_container_width=True)
-            
-            # Show starting XI and bench breakdown if applicable
-            if solution.get('starting_xi_stats'):
-                st.subheader("🏃 Starting XI vs Bench Breakdown")
-                
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    st.info(f"**Starting XI ({solution['starting_xi_stats']['formation']})**")
-                    st.metric("Starting XI Cost", f"£{solution['starting_xi_stats']['total_price']:.1f}m")
-                    st.metric("Starting XI Points", f"{solution['starting_xi_stats']['total_proj_points']}")
-                
-                with col2:
-                    st.info(f"**Bench ({solution['bench_stats']['count']} players)**")
-                    bench_cost = solution['bench_stats']['total_price']
-                    bench_budget_limit = solution.get('bench_budget')
-                    if bench_budget_limit:
-                        st.metric("Bench Cost", f"£{bench_cost:.1f}m", f"£{bench_budget_limit - bench_cost:.1f}m under budget")
-                    else:
-                        st.metric("Bench Cost", f"£{bench_cost:.1f}m")
-                    st.metric("Bench Points", f"{solution['bench_stats']['total_proj_points']}")
-            
-            # Validation results
-            validation = selector.validate_solution(solution)
-            
-            st.subheader("✅ Validation")
-            val_col1, val_col2, val_col3, val_col4, val_col5 = st.columns(5)
-            
-            with val_col1:
-                status = "✅" if validation['valid'] else "❌"
-                st.metric("Overall Valid", status)
-            
-            with val_col2:
-                status = "✅" if validation['squad_size'] else "❌"
-                st.metric("Squad Size (15)", status)
-            
-            with val_col3:
-                status = "✅" if validation['budget'] else "❌"
-                st.metric("Budget (≤£100m)", status)
-            
-            with val_col4:
-                status = "✅" if validation['positions'] else "❌"
-                st.metric("Positions (2-5-5-3)", status)
-            
-            with val_col5:
-                status = "✅" if validation['club_limits'] else "❌"
-                st.metric("Club Limits (≤3)", status)
-            
-            # Additional validations if applicable
-            if solution.get('starting_xi_stats') or solution.get('bench_budget') is not None:
-                val_col6, val_col7 = st.columns([1, 1])
-                
-                if solution.get('starting_xi_stats'):
-                    with val_col6:
-                        status = "✅" if validation.get('starting_xi_valid', True) else "❌"
-                        formation = solution.get('starting_xi_stats', {}).get('formation', 'N/A')
-                        st.metric(f"Starting XI ({formation})", status)
-                
-                if solution.get('bench_budget') is not None:
-                    with val_col7:
-                        status = "✅" if validation.get('bench_budget_valid', True) else "❌"
-                        st.metric("Bench Budget", status)
-            
-            # Export functionality
-            st.subheader("📋 Export")
-            
-            # Player IDs for FPL import
-            player_ids = solution['selected_ids']
-            id_string = ",".join(map(str, player_ids))
-            
-            st.text_area(
-                "Player IDs (for FPL import tools):",
-                value=id_string,
-                height=100,
-                help="Copy these player IDs to import into FPL tools"
-            )
-            
-            # Download CSV
-            csv = df_display.to_csv(index=False)
-            st.download_button(
-                label="📄 Download as CSV",
-                data=csv,
-                file_name="fpl_optimal_team.csv",
-                mime="text/csv"
-            )
-            
-        else:
-            st.error("❌ No feasible solution found! Try relaxing some constraints.")
-            
-    except Exception as e:
-        st.error(f"❌ Error: {str(e)}")
-        st.info("Make sure you have run the data processing script and have valid FPL data files.")
-
-# Display cached solution if available
-elif st.session_state.solution is not None:
-    solution = st.session_state.solution
-    
-    # Display solution summary
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        st.metric("Total Cost", f"£{solution['total_price']:.1f}m", f"£{100.0 - solution['total_price']:.1f}m remaining")
-    
-    with col2:
-        st.metric("Projected Points", f"{solution['total_proj_points']}")
-    
-    with col3:
-        st.metric("Avg Fixture Difficulty", f"{solution['avg_fixture_difficulty']:.2f}", help="Lower is easier fixtures")
-    
-    with col4:
-        if solution.get('fixture_weighting', 0) > 0:
-            st.metric("Fixture-Adjusted Points", f"{solution['total_fixture_adjusted_points']:.1f}")
-        elif solution.get('last_season_weighting', 0) > 0:
-            st.metric("History-Adjusted Points", f"{solution['total_last_season_adjusted_points']:.1f}")
-        else:
-            st.metric("Solver Status", solution['solver_status'])
-    
-    # Display team table
-    st.subheader("🎯 Optimal Team")
-    
-    # Load player pictures
-    player_pics = load_player_pics(data_dir)
-    
-    # Prepare display data ordered by position
-    position_order = ['GKP', 'DEF', 'MID', 'FWD']
-    display_data = []
-    
-    # Sort players by position order first
-    selected_players_df = pd.DataFrame(solution['selected_players'])
-    selected_players_df['position_order'] = selected_players_df['position'].map({pos: i for i, pos in enumerate(position_order)})
-    selected_players_df = selected_players_df.sort_values(['position_order', 'name'])
-    
-    for _, player in selected_players_df.iterrows():
-        # Get player picture URL
-        pic_url = player_pics.get(str(player['id']), "")
-        
-        row = {
-            'Photo': pic_url,
-            'Name': player['name'],
-            'Position': player['position'],
-            'Team': player['team_name'],
-            'Price': f"£{player['price']:.1f}m",
-            'Points': f"{player['proj_points']:.0f}",
-            'Fixture Difficulty': f"{player['avg_fixture_difficulty_5']:.1f}"
-        }
-        
-        # Add conditional columns based on weightings
-        # if solution.get('fixture_weighting', 0) > 0:
-        #     row['Fixture-Adj Points'] = f"{player['fixture_adjusted_points']:.1f}"
-        
-        if solution.get('last_season_weighting', 0) > 0:
-            row['Current PPG'] = f"{player['current_points_per_gw']:.1f}"
-            row['Last Season PPG'] = f"{player['last_season_points_per_gw']:.1f}"
-            # row['History-Adj Points'] = f"{player['last_season_adjusted_points']:.1f}"
-        
-        # Add fixtures as the last column
-        row['Next 5 Fixtures'] = player['next_5_fixtures']
-        
-        display_data.append(row)
-    
-    df_display = pd.DataFrame(display_data)
-    
-    # Style the dataframe
-    def style_position(val):
-        color_map = {
-            'GKP': 'background-color: #ffeb3b; color: black',
-            'DEF': 'background-color: #4caf50; color: white',
-            'MID': 'background-color: #2196f3; color: white',
-            'FWD': 'background-color: #f44336; color: white'
-        }
-        return color_map.get(val, '')
-    
-    # Configure column types, especially the Photo column as ImageColumn
-    column_config = {
-        "Photo": st.column_config.ImageColumn(
-            "Photo",
-            help="Player photo",
-            width="small"
-        )
-    }
-    
-    # Style the dataframe and show with image column
-    styled_df = df_display.style.applymap(style_position, subset=['Position'])
-    st.dataframe(
-        df_display, 
-        use_container_width=True, 
-        hide_index=True,
-        column_config=column_config,
-        height=len(df_display) * 35 + 40
-    )
-    
-    if params_changed and auto_refresh:
-        st.info("🔄 Parameters changed - optimization will run automatically")
+solve_params = {
+    'objective': objective,
+    'require_all_starts': require_all_starts,
+    'max_per_team_per_position': max_per_team_per_position,
+    'exclude_injury_risk': exclude_injury_risk,
+    'fixture_weighting_tenths': round(fixture_weighting * 10),
+    'last_season_weighting_tenths': round(last_season_weighting * 10),
+    'bench_budget': bench_budget,
+    'optimize_starting_xi': optimize_starting_xi
+}
 
-else:
-    # Initial state - show instructions
-    st.markdown("""
-    ## 🚀 Getting Started
-    
-    1. **Adjust parameters** in the sidebar:
-       - Choose optimization objective (maximize points vs maximize spend)
-       - Set fixture difficulty weighting (0.0 = ignore, 1.0 = heavy influence)
-       - Set last season weighting (0.0 = ignore history, 1.0 = heavy historical influence)
-       - Configure player selection constraints
-    
-    2. **Click "Optimize Team"** to run the algorithm
-    
-    3. **Review results** including:
-       - Optimal 15-player squad
-       - Cost breakdown and points projection
-       - Team and position distributions
-       - Validation against FPL rules
-    
-    ## 📊 Features
-    
-    - **Integer Linear Programming**: Uses OR-Tools for mathematically optimal solutions
-    - **Multi-objective**: Balance current form, fixtures, and historical performance
-    - **FPL Constraints**: Respects budget, positions, and club limits
-    - **Flexible Filtering**: Include/exclude rotation players, injury risks
-    - **Export Ready**: Get player IDs and CSV downloads
-    
-    ## 🔧 Requirements
-    
-    Make sure you have:
-    - FPL data files in `fpl_data/` directory
-    - Run `process_fpl_data.py` to get latest data
-    - OR-Tools installed: `uv add ortools`
-    - Streamlit installed: `uv add streamlit`
-    """)
-    
-    # Show example parameters
-    with st.expander("💡 Example Parameter Combinations"):
-        st.markdown("""
-        **Conservative (Current Form Focus):**
-        - Fixture Weighting: 0.0
-        - Last Season Weighting: 0.0
-        - All constraints enabled
-        - Optimize Starting XI: ON
-        
-        **Balanced Approach:**
-        - Fixture Weighting: 0.3
-        - Last Season Weighting: 0.4
-        - Regular starters only
-        - Optimize Starting XI: ON
-        
-        **Historical Focus:**
-        - Fixture Weighting: 0.1
-        - Last Season Weighting: 0.7
-        - Allow rotation players
-        - Optimize Starting XI: ON
-        
-        **Fixture-Heavy:**
-        - Fixture Weighting: 0.8
-        - Last Season Weighting: 0.2
-        - Exclude injury risks
-        - Optimize Starting XI: ON
-        
-        **Budget-Conscious (Cheap Bench):**
-        - Fixture Weighting: 0.2
-        - Last Season Weighting: 0.3
-        - Optimize Starting XI: ON
-        - Bench Budget: £18.0m
-        """)
+# Results panel runs as a fragment; sidebar changes still trigger a full rerun
+results_panel(data_dir, solve_params)
 
 # Footer
 st.markdown("---")
@@ -304,7 +304,8 @@ class FPLTeamSelector:
     def solve_team_selection(self, objective: str = 'max_points', require_all_starts: bool = True, 
                            max_per_team_per_position: bool = True, exclude_injury_risk: bool = True,
                            fixture_weighting: float = 0.0, last_season_weighting: float = 0.0,
-                           bench_budget: Optional[float] = None, optimize_starting_xi: bool = False) -> Dict:
+                           bench_budget: Optional[float] = None, optimize_starting_xi: bool = False,
+                           hint_player_ids: Optional[List[int]] = None) -> Dict:
         """
         Solve the FPL team selection problem using Integer Linear Programming.
         
@@ -317,6 +318,7 @@ class FPLTeamSelector:
             last_season_weighting: Weight for last season performance (0.0-1.0, higher = more historical influence)
             bench_budget: Maximum budget for bench players (None = no limit)
             optimize_starting_xi: If True, optimize starting XI points only, ignore bench
+            hint_player_ids: Player IDs from a previous solution, used to warm-start the solver
         
         Returns:
             Dictionary with solution details
@@ -409,39 +411,43 @@ class FPLTeamSelector:
                 bench_cost = sum(players_df.loc[i, 'price'] * (x[i] - s[i]) for i in players_df.index)
                 solver.Add(bench_cost <= bench_budget)
         
-        # Set objective
+        # Set objective (coefficients scaled for numerical stability)
+        coefficients = self._objective_coefficients(players_df, objective)
+        
         if objective == 'max_points':
             if optimize_starting_xi and s:
                 print("Optimizing starting XI points only...")
                 # Maximize last season adjusted points for starting XI only
-                solver.Maximize(
-                    sum(players_df.loc[i, 'last_season_adjusted_points'] * s[i] for i in players_df.index)
-                )
+                solver.Maximize(sum(coefficients[i] * s[i] for i in players_df.index))
             else:
                 # Maximize last season adjusted points (includes fixture adjustment if enabled)
-                solver.Maximize(
-                    sum(players_df.loc[i, 'last_season_adjusted_points'] * x[i] for i in players_df.index)
-                )
+                solver.Maximize(sum(coefficients[i] * x[i] for i in players_df.index))
         elif objective == 'max_spend':
             if optimize_starting_xi and s:
                 print("Maximizing starting XI spend...")
                 # Maximize starting XI spend with points as tiebreaker
-                epsilon = 1e-6
-                solver.Maximize(
-                    sum((players_df.loc[i, 'price'] + epsilon * players_df.loc[i, 'last_season_adjusted_points']) * s[i] 
-                        for i in players_df.index)
-                )
+                solver.Maximize(sum(coefficients[i] * s[i] for i in players_df.index))
             else:
                 # Maximize spend with last season adjusted points as tiebreaker
-                epsilon = 1e-6
-                solver.Maximize(
-                    sum((players_df.loc[i, 'price'] + epsilon * players_df.loc[i, 'last_season_adjusted_points']) * x[i] 
-                        for i in players_df.index)
-                )
+                solver.Maximize(sum(coefficients[i] * x[i] for i in players_df.index))
+        
+        # Warm-start from a previous squad (the solver ignores hints that are infeasible)
+        if hint_player_ids:
+            hinted = set(hint_player_ids)
+            print(f"Warm-starting solver with {len(hinted)} hinted players")
+            solver.SetHint(
+                [x[i] for i in players_df.index],
+                [1.0 if players_df.loc[i, 'id'] in hinted else 0.0 for i in players_df.index]
+            )
         
         # Solve
         print(f"Solving FPL team selection with objective: {objective}")
-        status = solver.Solve()
+        solver_params = pywraplp.MPSolverParameters()
+        if objective == 'max_spend':
+            # Solve to proven optimality: the default 1e-4 relative gap is larger than
+            # the points tiebreaker, which would then be ignored
+            solver_params.SetDoubleParam(pywraplp.MPSolverParameters.RELATIVE_MIP_GAP, 0.0)
+        status = solver.Solve(solver_params)
         
         if status == pywraplp.Solver.OPTIMAL:
             return self._extract_solution(solver, x, players_df, objective, status, fixture_weighting, last_season_weighting, s, bench_budget, optimize_starting_xi)
@@ -456,6 +462,28 @@ class FPLTeamSelector:
             print("- Club constraints are too tight")
             return None
     
+    def _objective_coefficients(self, players_df: pd.DataFrame, objective: str) -> pd.Series:
+        """
+        Per-player objective coefficients, scaled so they span a narrow range.
+        
+        Keeps coefficients well inside the solver's tolerances:
+        - max_points: adjusted points divided by the largest absolute value (|c| <= 1).
+          A positive rescale, so the optimal squad and relative MIP gap are unchanged.
+        - max_spend: price in integer tenths of a million plus points min-max scaled
+          to [0, 1/16], so the tiebreaker summed over 15 players can never outweigh
+          a £0.1m difference in spend. The squad matches the old epsilon tiebreaker
+          only when solved with a zero MIP gap (see solve_team_selection).
+        """
+        points = players_df['last_season_adjusted_points'].astype(float)
+        
+        if objective == 'max_spend':
+            points_range = points.max() - points.min()
+            tiebreak = (points - points.min()) / points_range if points_range > 0 else points * 0.0
+            return (players_df['price'] * 10).round() + tiebreak / 16
+        
+        max_abs_points = points.abs().max()
+        return points / max_abs_points if max_abs_points > 0 else points
+    
     def _extract_solution(self, solver, x, players_df, objective, status, fixture_weighting, last_season_weighting, s=None, bench_budget=None, optimize_starting_xi=False) -> Dict:
         """Extract and format the solution."""
         selected_indices = [i for i in players_df.index if x[i].solution_value() > 0.5]
@@ -552,7 +580,8 @@ class FPLTeamSelector:
         
         return solution
     
-    def validate_solution(self, solution: Dict) -> Dict[str, bool]:
+    @staticmethod
+    def validate_solution(solution: Dict) -> Dict[str, bool]:
         """
         Validate that the solution meets all FPL constraints.
         